@@ -9,11 +9,16 @@ single-instance guard, автоустановка зависимостей пр
 
 import os
 import sys
+import gc
 import json
+import math
 import time
 import re
+import argparse
+import queue
 import threading
 import tempfile
+import tracemalloc
 import subprocess
 import importlib
 from datetime import datetime
@@ -72,6 +77,9 @@ DEFAULT_CONFIG = {
     "hotkey": "ctrl+b",
     "tesseract_path": r"C:\Program Files\Tesseract-OCR\tesseract.exe",
     "screenshot_dir": os.path.join(BASE_DIR, "screenshot_temp"),
+    # лимиты памяти для долгих сессий
+    "max_text_chars": 200000,      # лимит текста в полях ответа и OCR (целое > 0)
+    "trace_memory": False,         # запускать tracemalloc при старте
     "providers": {
         "openai": {
             "api_key": "",
@@ -110,6 +118,18 @@ DEFAULT_CONFIG = {
 
 os.makedirs(DEFAULT_CONFIG["screenshot_dir"], exist_ok=True)
 
+def normalize_memory_limits(cfg):
+    # лимиты памяти: битые значения из ручной правки заменяем значениями по умолчанию
+    for k in ("max_text_chars",):
+        value = cfg.get(k)
+        if isinstance(value, float) and math.isfinite(value) and value.is_integer():
+            value = int(value)
+        # bool — подкласс int, поэтому true/false отсекаем явно; 0 отключил бы обрезку
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            value = DEFAULT_CONFIG[k]
+        cfg[k] = value
+    return cfg
+
 def load_config():
     if os.path.exists(CONFIG_FILE):
         try:
@@ -130,6 +150,7 @@ def load_config():
     for k,v in cfg.items():
         if k not in merged:
             merged[k] = v
+    normalize_memory_limits(merged)
     # ensure screenshot dir exists
     os.makedirs(merged.get("screenshot_dir", DEFAULT_CONFIG["screenshot_dir"]), exist_ok=True)
     return merged
@@ -188,10 +209,11 @@ def remove_lock():
     except Exception:
         pass
 
-if is_already_running():
-    print("Приложение уже запущено. Выход.")
-    sys.exit(0)
-else:
+def acquire_single_instance():
+    # вызывается из main() только для обычного запуска: soak-тест lock-файл не трогает
+    if is_already_running():
+        print("Приложение уже запущено. Выход.")
+        sys.exit(0)
     write_lock()
 
 # ----------------------------
@@ -225,6 +247,92 @@ def strip_markdown(text: str) -> str:
 def pretty_format_response(text: str) -> str:
     return strip_markdown(text)
 
+def show_message(kind: str, title: str, text: str):
+    # kind: "info" | "warning" | "error"; в soak-тесте подменяется, чтобы не открывать модальные окна
+    getattr(messagebox, f"show{kind}")(title, text)
+
+def clip_text(text: str, limit: int) -> str:
+    # обрезаем слишком длинный текст, чтобы виджеты не росли без ограничений
+    if limit and limit > 0 and len(text) > limit:
+        return text[:limit] + f"\n\n[… обрезано {len(text) - limit} символов]"
+    return text
+
+def run_ocr(image) -> str:
+    try:
+        return pytesseract.image_to_string(image, lang="eng+rus", config="--psm 6")
+    except Exception as e:
+        return f"[OCR error: {e}]"
+
+# ----------------------------
+# Память процесса (RSS) и отчёт tracemalloc
+# ----------------------------
+def get_rss_bytes() -> int:
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return int(counters.WorkingSetSize)
+        except Exception:
+            pass
+        return 0
+    # Linux: текущий RSS из /proc
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    # прочие unix: только пиковое значение
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return 0
+
+def format_mb(num_bytes: int) -> str:
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+def tracemalloc_report(previous=None, limit: int = 15):
+    """Возвращает (текст отчёта, снимок). previous — прошлый снимок для сравнения."""
+    if not tracemalloc.is_tracing():
+        return "tracemalloc выключен.", None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [f"Отслежено Python-аллокаций: {format_mb(current)} (пик {format_mb(peak)})", ""]
+    lines.append(f"Топ-{limit} по строкам кода:")
+    for stat in snapshot.statistics("lineno")[:limit]:
+        lines.append(f"  {stat}")
+    if previous is not None:
+        lines.append("")
+        lines.append(f"Рост с прошлого отчёта (топ-{limit}):")
+        for stat in snapshot.compare_to(previous, "lineno")[:limit]:
+            lines.append(f"  {stat}")
+    return "\n".join(lines), snapshot
+
 # ----------------------------
 # HTTP-вызовы к провайдерам
 # ----------------------------
@@ -263,8 +371,15 @@ def call_google_genai(api_key: str, model: str, prompt: str) -> str:
     # try to extract text
     return getattr(resp, "text", str(resp))
 
+def call_mock(prompt: str) -> str:
+    # офлайн-провайдер для диагностики и soak-теста: без сети и ключей
+    head = prompt.strip().splitlines()[0][:80] if prompt.strip() else ""
+    return f"**Mock-ответ** ({len(prompt)} символов в запросе)\n\n> {head}\n\n`ok`"
+
 def unified_call(provider_name: str, prompt: str) -> str:
     prov = provider_name.lower()
+    if prov == "mock":
+        return call_mock(prompt)
     providers = config.get("providers", {})
     if prov not in providers:
         raise RuntimeError(f"Провайдер '{prov}' не сконфигурирован.")
@@ -331,7 +446,7 @@ class SplashScreen(ctk.CTk):
         self.destroy()
 
 class ChatApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, register_hotkey=True):
         super().__init__()
         # иконка (если есть)
         try:
@@ -353,7 +468,22 @@ class ChatApp(ctk.CTk):
         # хоткей
         self.hotkey = config.get("hotkey", "ctrl+b")
         self.hotkey_handler = None
-        self.after(1500, self._register_hotkey_delayed)
+        if register_hotkey:
+            self.after(1500, self._register_hotkey_delayed)
+
+        # жизненный цикл изображений и запросов
+        self.grab_image = ImageGrab.grab   # подменяется в soak-тесте
+        self.ocr_image = run_ocr
+        self.show_message = show_message
+        self.capture_seq = 0               # число завершённых попыток скриншота
+        self._photo = None                 # текущая миниатюра (ImageTk.PhotoImage)
+        self._overlay = None               # окно выделения области
+        self._request_seq = 0
+        self._answered_seq = 0
+        # очередь задач для главного потока: воркеры и хоткей не вызывают Tk (даже after) напрямую
+        self._ui_queue = queue.Queue()
+        self.after(50, self._drain_ui_queue)
+        self._last_snapshot = None
 
         # сетка
         self.columnconfigure((0,1), weight=1)
@@ -407,6 +537,7 @@ class ChatApp(ctk.CTk):
         ctk.CTkButton(right_controls, text="⚡ Вопрос", command=self.ask_ai, width=120).pack(side="left", padx=4)
         ctk.CTkButton(right_controls, text="📋 Копировать ответ", command=self.copy_answer, width=160).pack(side="left", padx=4)
         ctk.CTkButton(right_controls, text="🗑 Очистить", command=self.clear_answer, width=120, fg_color="#444", hover_color="#666").pack(side="left", padx=4)
+        ctk.CTkButton(right_controls, text="🧠 Память", command=self.show_memory_report, width=110).pack(side="left", padx=4)
         ctk.CTkButton(right_controls, text="⚙️ Настройки", command=self.show_settings, width=120).pack(side="left", padx=6)
         ctk.CTkButton(right_controls, text="❌ Выход", command=self.on_closing, width=100, fg_color="#c0392b").pack(side="left", padx=6)
 
@@ -418,7 +549,8 @@ class ChatApp(ctk.CTk):
         except Exception:
             pass
         try:
-            self.hotkey_handler = keyboard.add_hotkey(self.hotkey, self.capture_area)
+            # колбэк keyboard приходит из чужого потока — передаём через очередь главному циклу Tk
+            self.hotkey_handler = keyboard.add_hotkey(self.hotkey, lambda: self._ui_queue.put((self.capture_area, ())))
         except Exception as e:
             print("Не удалось зарегистрировать хоткей:", e)
 
@@ -428,11 +560,15 @@ class ChatApp(ctk.CTk):
         self.after(200, self._capture_selection)
 
     def _capture_selection(self):
-        root = tk.Tk()
-        root.attributes("-fullscreen", True)
-        root.attributes("-alpha", 0.25)
-        canvas = tk.Canvas(root, cursor="cross", bg="gray")
+        # одно окно-оверлей поверх главного окна вместо нового tk.Tk() на каждый снимок
+        self._close_overlay()
+        overlay = tk.Toplevel(self)
+        overlay.attributes("-fullscreen", True)
+        overlay.attributes("-alpha", 0.25)
+        overlay.attributes("-topmost", True)
+        canvas = tk.Canvas(overlay, cursor="cross", bg="gray")
         canvas.pack(fill="both", expand=True)
+        self._overlay = overlay
         rect = None
         start_x = start_y = 0
 
@@ -449,29 +585,79 @@ class ChatApp(ctk.CTk):
         def on_release(e):
             x1, x2 = sorted([start_x, e.x])
             y1, y2 = sorted([start_y, e.y])
-            root.destroy()
-            if x1 == x2 or y1 == y2:
-                messagebox.showwarning("Ошибка", "Область скриншота слишком мала!")
-                self.deiconify()
-                return
-            image = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-            thumb = image.copy()
-            thumb.thumbnail((360, 270))
-            tkimg = ImageTk.PhotoImage(thumb)
-            self.screenshot_display.configure(image=tkimg, text="")
-            self.screenshot_display.image = tkimg
-            try:
-                text = pytesseract.image_to_string(image, lang="eng+rus", config="--psm 6")
-            except Exception as e:
-                text = f"[OCR error: {e}]"
-            self.recognized_text.delete("1.0", "end")
-            self.recognized_text.insert("1.0", text.strip())
+            self._close_overlay()
+            # даём оконному менеджеру убрать оверлей, чтобы он не попал в снимок
+            self.after(50, self._finish_selection, (x1, y1, x2, y2))
+
+        def on_cancel(e=None):
+            self._close_overlay()
             self.deiconify()
 
         canvas.bind("<ButtonPress-1>", on_click)
         canvas.bind("<B1-Motion>", on_drag)
         canvas.bind("<ButtonRelease-1>", on_release)
-        root.mainloop()
+        overlay.bind("<Escape>", on_cancel)
+        # закрытие оверлея оконным менеджером (Alt+F4, панель задач) — то же, что Esc
+        overlay.protocol("WM_DELETE_WINDOW", on_cancel)
+        overlay.focus_force()
+
+    def _close_overlay(self):
+        overlay, self._overlay = self._overlay, None
+        if overlay is not None:
+            try:
+                overlay.destroy()
+            except Exception:
+                pass
+
+    def _finish_selection(self, bbox):
+        x1, y1, x2, y2 = bbox
+        try:
+            if x1 == x2 or y1 == y2:
+                self.show_message("warning", "Ошибка", "Область скриншота слишком мала!")
+                return
+            image = self.grab_image(bbox=bbox)
+            self._process_capture(image)
+        except Exception as e:
+            self.show_message("error", "Ошибка", f"Не удалось обработать скриншот: {e}")
+        finally:
+            # главное окно возвращаем при любой ошибке, иначе оно остаётся скрытым
+            self.capture_seq += 1
+            self.deiconify()
+
+    def _process_capture(self, image):
+        thumb = image.copy()
+        thumb.thumbnail((360, 270))
+        photo = ImageTk.PhotoImage(thumb)
+        thumb.close()
+        self.screenshot_display.configure(image=photo, text="")
+        self._release_photo()
+        self._photo = photo
+        try:
+            text = self.ocr_image(image)
+        finally:
+            # полноразмерный снимок после OCR не нужен — в памяти живёт только миниатюра
+            image.close()
+        self._set_text(self.recognized_text, text.strip())
+
+    # ---------- бюджет памяти ----------
+    def _release_photo(self):
+        photo, self._photo = self._photo, None
+        if photo is not None:
+            try:
+                self.tk.call("image", "delete", str(photo))
+            except Exception:
+                pass
+
+    def preview_nbytes(self):
+        # Tk хранит фото как RGBA — 4 байта на пиксель
+        if self._photo is None:
+            return 0
+        return self._photo.width() * self._photo.height() * 4
+
+    def _set_text(self, widget, text):
+        limit = config["max_text_chars"]
+        widget.delete("1.0", "end")
+        widget.insert("1.0", clip_text(text, limit))
 
     # ---------- отправка запроса ----------
     def _on_enter_send(self, event):
@@ -484,32 +670,51 @@ class ChatApp(ctk.CTk):
             question = custom_text
         context = self.recognized_text.get("1.0", "end").strip()
         if not question and not context:
-            messagebox.showinfo("Внимание", "Введите вопрос или сделайте скриншот.")
+            self.show_message("info", "Внимание", "Введите вопрос или сделайте скриншот.")
             return
         prompt = f"{context}\n\nПользователь спрашивает: {question}"
-        self.ai_answer.delete("1.0", "end")
-        self.ai_answer.insert("1.0", "⏳ Отправляю запрос...")
-        threading.Thread(target=self._generate_thread, args=(prompt,), daemon=True).start()
+        self._request_seq += 1
+        self._set_text(self.ai_answer, "⏳ Отправляю запрос...")
+        threading.Thread(target=self._generate_thread, args=(prompt, self._request_seq), daemon=True).start()
 
-    def _generate_thread(self, prompt):
+    def _generate_thread(self, prompt, seq):
         try:
             provider = config.get("provider", "openai")
             raw = unified_call(provider, prompt)
             out = pretty_format_response(raw)
             out = strip_markdown(out)
-            self.ai_answer.delete("1.0", "end")
-            self.ai_answer.insert("1.0", out.strip())
-            self.ai_answer.see("1.0")
+            result = out.strip()
         except requests.HTTPError as he:
             try:
                 text = he.response.text
             except Exception:
                 text = str(he)
-            self.ai_answer.delete("1.0", "end")
-            self.ai_answer.insert("1.0", f"⚠️ HTTP Error: {he}\n{text}")
+            result = f"⚠️ HTTP Error: {he}\n{text}"
         except Exception as e:
-            self.ai_answer.delete("1.0", "end")
-            self.ai_answer.insert("1.0", f"⚠️ Ошибка: {e}")
+            result = f"⚠️ Ошибка: {e}"
+        # Tk трогаем только из главного потока; если окно уже закрыто, результат просто никто не заберёт
+        self._ui_queue.put((self._show_answer, (seq, result)))
+
+    def _drain_ui_queue(self):
+        try:
+            while True:
+                try:
+                    callback, args = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+        finally:
+            self.after(50, self._drain_ui_queue)
+
+    def _show_answer(self, seq, text):
+        if seq != self._request_seq:
+            return  # ответ на устаревший запрос
+        self._answered_seq = seq
+        self._set_text(self.ai_answer, text)
+        self.ai_answer.see("1.0")
+
+    def answer_pending(self):
+        return self._answered_seq != self._request_seq
 
     # ---------- буфер обмена ----------
     def paste_clipboard(self):
@@ -528,6 +733,55 @@ class ChatApp(ctk.CTk):
     def clear_answer(self):
         self.ai_answer.delete("1.0", "end")
 
+    # ---------- отчёт о памяти ----------
+    def memory_report(self):
+        lines = [
+            f"RSS процесса: {format_mb(get_rss_bytes())}",
+            f"Миниатюра скриншота: {format_mb(self.preview_nbytes())} (не больше 360x270)",
+            f"Символов: ответ {len(self.ai_answer.get('1.0', 'end'))}, OCR {len(self.recognized_text.get('1.0', 'end'))}, "
+            f"лимит {config.get('max_text_chars')}",
+            f"Объектов под наблюдением gc: {len(gc.get_objects())}",
+            "",
+        ]
+        if tracemalloc.is_tracing():
+            text, self._last_snapshot = tracemalloc_report(self._last_snapshot)
+            lines.append(text)
+        else:
+            lines.append("tracemalloc выключен — включите трассировку, чтобы увидеть аллокации.")
+        return "\n".join(lines)
+
+    def set_tracing(self, enabled):
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            # трассировка дорогая: останавливаем и отпускаем снимок целиком
+            tracemalloc.stop()
+        if not enabled:
+            self._last_snapshot = None
+
+    def show_memory_report(self):
+        win = ctk.CTkToplevel(self)
+        win.title("🧠 Память")
+        win.geometry("900x560")
+        box = ctk.CTkTextbox(win, wrap="none", font=("Consolas", 12))
+        box.pack(fill="both", expand=True, padx=12, pady=(12, 6))
+
+        def refresh():
+            trace_btn.configure(text="⏹ Выключить трассировку" if tracemalloc.is_tracing() else "▶ Включить трассировку")
+            box.delete("1.0", "end")
+            box.insert("1.0", self.memory_report())
+
+        def toggle_tracing():
+            self.set_tracing(not tracemalloc.is_tracing())
+            refresh()
+
+        buttons = ctk.CTkFrame(win)
+        buttons.pack(fill="x", padx=12, pady=(0, 12))
+        ctk.CTkButton(buttons, text="🔄 Обновить", command=refresh, width=120).pack(side="left", padx=4)
+        trace_btn = ctk.CTkButton(buttons, text="", command=toggle_tracing, width=200)
+        trace_btn.pack(side="left", padx=4)
+        refresh()
+
     # ---------- окно настроек (полное, с сохранением по провайдеру) ----------
     def show_settings(self):
         win = ctk.CTkToplevel(self)
@@ -632,13 +886,166 @@ class ChatApp(ctk.CTk):
                 keyboard.remove_hotkey(self.hotkey_handler)
         except Exception:
             pass
+        self._close_overlay()
+        self._release_photo()
         remove_lock()
         self.destroy()
 
+# ----------------------------
+# Soak-тест: тысячи циклов скриншот/вопрос без сети (запуск под Xvfb на Linux)
+#   xvfb-run -a -s "-screen 0 2560x1440x24" python chat_gui_ultimate.py --soak 2000 --max-growth-mb 40
+# ----------------------------
+SOAK_SIZES = [(1920, 1080), (1280, 720), (800, 600), (2560, 1440)]
+SOAK_CYCLE_TIMEOUT = 10  # секунд на один цикл скриншот/вопрос, иначе — провал (зависание)
+
+def _soak_grab(bbox=None):
+    x1, y1, x2, y2 = bbox
+    return Image.effect_noise((x2 - x1, y2 - y1), 48).convert("RGB")
+
+def run_soak(cycles: int, max_growth_mb: float, warmup: int = 50, trace: bool = False) -> int:
+    # провайдер меняется только в памяти: soak никогда не вызывает save_config
+    config["provider"] = "mock"
+    app = ChatApp(register_hotkey=False)
+    app.grab_image = _soak_grab
+    app.ocr_image = lambda image: f"soak OCR {image.width}x{image.height}\n" + "lorem ipsum " * 200
+    # никаких модальных окон: под Xvfb их некому закрыть, любое сообщение — провал
+    failures = []
+    app.show_message = lambda kind, title, text: failures.append(f"{kind}: {title}: {text}")
+    state = {"cycle": 0, "phase": "idle", "deadline": 0.0, "capture_seq": 0,
+             "baseline": get_rss_bytes(), "started": time.time(), "code": 0}
+
+    def finish():
+        app._close_overlay()
+        app._release_photo()
+        app.set_tracing(False)
+        app.destroy()
+
+    def fail(reason):
+        print(f"[soak] FAIL на цикле {state['cycle']} (фаза {state['phase']}): {reason}")
+        state["code"] = 1
+        finish()
+
+    def report():
+        gc.collect()
+        rss = get_rss_bytes()
+        growth = rss - state["baseline"]
+        elapsed = time.time() - state["started"]
+        print(f"[soak] {cycles} циклов за {elapsed:.1f} с; RSS {format_mb(state['baseline'])} -> {format_mb(rss)} "
+              f"(рост {format_mb(growth)}, порог {max_growth_mb} MB)")
+        if growth > max_growth_mb * 1024 * 1024:
+            print("[soak] FAIL: рост памяти выше порога")
+            print(app.memory_report())
+            if not trace:
+                print("[soak] Повторите с --trace, чтобы увидеть рост аллокаций с конца прогрева.")
+            state["code"] = 1
+        else:
+            print("[soak] OK")
+
+    def start_cycle():
+        i = state["cycle"]
+        if i == warmup:
+            # базовая линия после прогрева: кэши Tk/Pillow/аллокатора уже заполнены
+            gc.collect()
+            if trace:
+                # снимок после прогрева — отчёт при FAIL покажет рост относительно него
+                app.set_tracing(True)
+                _, app._last_snapshot = tracemalloc_report()
+            state["baseline"] = get_rss_bytes()
+        if i >= cycles:
+            report()
+            finish()
+            return False
+        state["capture_seq"] = app.capture_seq
+        state["deadline"] = time.time() + SOAK_CYCLE_TIMEOUT
+        state["phase"] = "overlay"
+        # реальный путь: withdraw -> after -> оверлей -> отпускание мыши -> after -> deiconify
+        app.capture_area()
+        return True
+
+    def drag_selection():
+        overlay = app._overlay
+        if overlay is None or not overlay.winfo_viewable():
+            return
+        w, h = SOAK_SIZES[state["cycle"] % len(SOAK_SIZES)]
+        w, h = min(w, app.winfo_screenwidth()), min(h, app.winfo_screenheight())
+        canvas = overlay.winfo_children()[0]
+        canvas.event_generate("<ButtonPress-1>", x=0, y=0)
+        canvas.event_generate("<B1-Motion>", x=w // 2, y=h // 2)
+        canvas.event_generate("<ButtonRelease-1>", x=w, y=h)
+        state["phase"] = "capture"
+
+    def step():
+        if failures:
+            fail(failures[0])
+            return
+        phase = state["phase"]
+        if phase != "idle" and time.time() > state["deadline"]:
+            fail(f"цикл не завершился за {SOAK_CYCLE_TIMEOUT} с")
+            return
+        if phase == "idle":
+            if not start_cycle():
+                return
+        elif phase == "overlay":
+            drag_selection()
+        elif phase == "capture":
+            if app.capture_seq != state["capture_seq"]:
+                if app.state() == "withdrawn":
+                    fail("главное окно осталось скрытым после скриншота")
+                    return
+                app.user_input.delete("1.0", "end")
+                app.user_input.insert("1.0", f"Вопрос #{state['cycle']}")
+                app.ask_ai()
+                state["phase"] = "answer"
+        elif phase == "answer":
+            if not app.answer_pending():
+                answer = app.ai_answer.get("1.0", "end").strip()
+                if answer.startswith("⚠️"):
+                    fail(answer)
+                    return
+                state["cycle"] += 1
+                state["phase"] = "idle"
+                if state["cycle"] % 100 == 0:
+                    print(f"[soak] {state['cycle']}/{cycles}, RSS {format_mb(get_rss_bytes())}")
+        app.after(1, step)
+
+    app.after(100, step)
+    app.mainloop()
+    return state["code"]
+
 # ----------------------------
 # Запуск
 # ----------------------------
+def _positive_int(value):
+    n = int(value)
+    if n <= 0:
+        raise argparse.ArgumentTypeError(f"ожидается целое > 0, получено {value}")
+    return n
+
+def _non_negative_int(value):
+    n = int(value)
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"ожидается целое >= 0, получено {value}")
+    return n
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI Screenshot Assistant Ultimate")
+    parser.add_argument("--soak", type=_positive_int, metavar="N", help="прогнать N циклов скриншот/вопрос с mock-провайдером")
+    parser.add_argument("--max-growth-mb", type=float, default=50.0, help="допустимый рост RSS в soak-тесте")
+    parser.add_argument("--warmup", type=_non_negative_int, default=50, help="циклов прогрева до замера базового RSS")
+    parser.add_argument("--trace", action="store_true", help="включить tracemalloc в soak-тесте после прогрева")
+    args = parser.parse_args(argv)
+    if args.soak is not None and args.soak <= args.warmup:
+        # иначе базовая линия снимается прямо перед финалом и рост всегда ~0
+        parser.error(f"--soak ({args.soak}) должен быть больше --warmup ({args.warmup})")
+    return args
+
 def main():
+    args = parse_args()
+    if args.soak:
+        sys.exit(run_soak(args.soak, args.max_growth_mb, args.warmup, args.trace))
+    acquire_single_instance()
+    if config.get("trace_memory"):
+        tracemalloc.start()
     try:
         # показываем экран загрузки
         splash = SplashScreen()
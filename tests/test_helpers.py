@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Headless-проверки вспомогательных функций chat_gui_ultimate.py.
+
+Импортировать модуль целиком нельзя: при импорте он ставит пакеты через pip,
+создаёт каталоги и поднимает GUI-зависимости. Поэтому нужные функции
+достаются из исходника через ast и выполняются в отдельном пространстве имён.
+"""
+
+import ast
+import math
+import os
+import unittest
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chat_gui_ultimate.py")
+
+
+def load_functions(*names, **namespace):
+    with open(SOURCE, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), SOURCE)
+    nodes = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name in names]
+    missing = set(names) - {n.name for n in nodes}
+    if missing:
+        raise AssertionError(f"функции не найдены: {sorted(missing)}")
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), SOURCE, "exec"), namespace)
+    return namespace
+
+
+class ClipTextTest(unittest.TestCase):
+    def setUp(self):
+        self.clip_text = load_functions("clip_text")["clip_text"]
+
+    def test_short_text_unchanged(self):
+        self.assertEqual(self.clip_text("abc", 10), "abc")
+
+    def test_long_text_clipped_with_note(self):
+        out = self.clip_text("a" * 25, 10)
+        self.assertTrue(out.startswith("a" * 10 + "\n\n"))
+        self.assertIn("15", out)
+        self.assertNotIn("a" * 11, out)
+
+
+class NormalizeMemoryLimitsTest(unittest.TestCase):
+    DEFAULT = 200000
+
+    def setUp(self):
+        ns = load_functions("normalize_memory_limits", math=math,
+                            DEFAULT_CONFIG={"max_text_chars": self.DEFAULT})
+        self.normalize = ns["normalize_memory_limits"]
+
+    def check(self, value, expected):
+        self.assertEqual(self.normalize({"max_text_chars": value})["max_text_chars"], expected)
+
+    def test_valid_values_kept(self):
+        self.check(5000, 5000)
+        self.check(5000.0, 5000)
+
+    def test_invalid_values_fall_back_to_default(self):
+        for value in (None, 0, -1, True, False, 2.9, float("nan"), float("inf"), "5000", "abc", [1]):
+            with self.subTest(value=value):
+                self.check(value, self.DEFAULT)
+
+    def test_missing_key_gets_default(self):
+        self.assertEqual(self.normalize({})["max_text_chars"], self.DEFAULT)
+
+
+if __name__ == "__main__":
+    unittest.main()